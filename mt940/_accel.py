@@ -0,0 +1,102 @@
+'''
+Optional accelerated helpers for aggregating the amounts of parsed
+transactions.
+
+Numba only helps with numeric loops, the (string based) parser itself does
+not benefit from it so it is only used for the aggregation of amounts after
+parsing. `numba` and `numpy` are only imported on the first use so importing
+`mt940` doesn't pay for them. When they are not available, or the amounts
+don't fit in 64 bit integers, a pure Python implementation is used instead.
+'''
+import decimal
+import functools
+import itertools
+
+#: The largest (absolute) total the numba loop can hold without overflowing
+_INT64_MAX = 2 ** 63 - 1
+
+
+def _running_total(values, start):
+    '''
+    Return the running total of a sequence of integers, this is compiled
+    with numba on first use when it's available
+
+    >>> _running_total([1, 2, 3], 10)
+    [11, 13, 16]
+    '''
+    totals = values.copy()
+    total = start
+    for i in range(len(values)):
+        total += values[i]
+        totals[i] = total
+    return totals
+
+
+@functools.lru_cache(maxsize=None)
+def _load_running_total():
+    '''
+    Return the numba compiled running total of a list of integers or `None`
+    when numba is not available
+    '''
+    try:
+        import numpy
+        import numba  # pragma: no cover
+    except ImportError:
+        return None
+
+    # The kernel is a module level function so numba can cache it on disk
+    running_total = numba.njit(cache=True)(_running_total)  # pragma: no cover
+
+    def numba_running_total(values, start):  # pragma: no cover
+        values = numpy.array(values, dtype=numpy.int64)
+        return running_total(values, start).tolist()
+
+    return numba_running_total  # pragma: no cover
+
+
+def _running_balance_scaled(amounts, start, running_total):
+    # Convert the decimals to scaled integers so the summation stays exact
+    values = [start] + amounts
+    if not all(value.is_finite() for value in values):
+        return None
+
+    exponent = max(-value.as_tuple().exponent for value in values)
+    scaled = [int(value.scaleb(exponent)) for value in values]
+
+    # None of the intermediate totals can exceed the sum of the absolutes
+    if sum(map(abs, scaled)) > _INT64_MAX:
+        return None
+
+    totals = running_total(scaled[1:], scaled[0])
+    return [decimal.Decimal(total).scaleb(-exponent) for total in totals]
+
+
+def _running_balance_python(amounts, start):
+    totals = itertools.accumulate(itertools.chain([start], amounts))
+    # Skip the starting balance itself
+    next(totals)
+    return list(totals)
+
+
+def running_balance(amounts, start=decimal.Decimal(0)):
+    '''
+    Return the balance after each of the given amounts
+
+    >>> running_balance([decimal.Decimal('1.50'), decimal.Decimal('-0.25')],
+    ...                 decimal.Decimal('10'))
+    [Decimal('11.50'), Decimal('11.25')]
+
+    Args:
+        amounts (list): :py:class:`decimal.Decimal` amounts to add
+        start (decimal.Decimal): The starting balance
+
+    Returns: :py:class:`list` of :py:class:`decimal.Decimal`
+    '''
+    amounts = list(amounts)
+    running_total = _load_running_total() if amounts else None
+    if running_total is not None:
+        totals = _running_balance_scaled(amounts, start, running_total)
+        if totals is not None:
+            return totals
+
+    return _running_balance_python(amounts, start)
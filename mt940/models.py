@@ -1,18 +1,19 @@
 import re
 import decimal
 import datetime
+import functools
 
-# python 3.8+ compatibility
-try:  # pragma: no cover
-    from collections import abc
-except ImportError:  # pragma: no cover
-    import collections as abc
+from collections import abc
 
 import mt940
 
-from . import _compat
+from . import _accel
 from . import processors
 
+tag_re = re.compile(
+    r'^:\n?(?P<full_tag>(?P<tag>[0-9]{2}|NS)(?P<sub_tag>[A-Z])?):',
+    re.MULTILINE)
+
 
 class Model(object):
 
@@ -92,8 +93,9 @@ class DateTime(datetime.datetime, Model):
                 second='0',
                 microsecond='0', )
 
-            # The list makes sure this works in both Python 2 and 3
-            for key, default in list(values.items()):
+            # Only existing keys are replaced so iterating while updating is
+            # safe
+            for key, default in values.items():
                 # Fetch the value or the default
                 value = kwargs.get(key, default)
                 assert value is not None, '%s should not be None' % key
@@ -121,6 +123,18 @@ class DateTime(datetime.datetime, Model):
             return datetime.datetime.__new__(cls, *args, **kwargs)
 
 
+#: The keyword arguments that `Date` converts through the `_date_parts` cache
+_DATE_KEYS = frozenset(('year', 'month', 'day'))
+
+
+@functools.lru_cache(maxsize=1024)
+def _date_parts(year, month, day):
+    # Dates repeat a lot within a statement so cache the conversion of the
+    # (string) values to integers
+    dt = DateTime(year=year, month=month, day=day)
+    return dt.year, dt.month, dt.day
+
+
 class Date(datetime.date, Model):
     '''Just a regular date object which supports dates given as strings
 
@@ -130,6 +144,16 @@ class Date(datetime.date, Model):
     >>> Date(year='123', month='1', day='2')
     Date(2123, 1, 2)
 
+    Other arguments are passed to (and validated by) `DateTime`
+
+    >>> Date(year='2000', month='1', day='2', hour='3')
+    Date(2000, 1, 2)
+
+    >>> Date(year='2000', month='1', day='2', hour='x')
+    Traceback (most recent call last):
+    ...
+    ValueError: invalid literal for int() with base 10: 'x'
+
     Args:
         year (str): Year (0-100), will automatically add 2000 when needed
         month (str): Month
@@ -137,12 +161,29 @@ class Date(datetime.date, Model):
     '''
 
     def __new__(cls, *args, **kwargs):
-        if kwargs:
-            dt = DateTime(*args, **kwargs).date()
-
-            return datetime.date.__new__(cls, dt.year, dt.month, dt.day)
+        if not args and kwargs.keys() == _DATE_KEYS:
+            parts = _date_parts(
+                kwargs['year'], kwargs['month'], kwargs['day'])
+        elif kwargs:
+            dt = DateTime(*args, **kwargs)
+            parts = dt.year, dt.month, dt.day
         else:
-            return datetime.date.__new__(cls, *args, **kwargs)
+            return datetime.date.__new__(cls, *args)
+
+        return datetime.date.__new__(cls, *parts)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_amount(amount, status):
+    # Decimals are immutable so the parsed (and signed) amounts can safely be
+    # shared between Amount instances
+    value = decimal.Decimal(amount.replace(',', '.'))
+
+    # C = credit, D = debit
+    if status == 'D':
+        value = -value
+
+    return value
 
 
 class Amount(Model):
@@ -160,14 +201,9 @@ class Amount(Model):
     '''
 
     def __init__(self, amount, status, currency=None, **kwargs):
-        self.amount = decimal.Decimal(amount.replace(',', '.'))
+        self.amount = _parse_amount(amount, status)
         self.currency = currency
 
-        # C = credit, D = debit
-
-        if status == 'D':
-            self.amount = -self.amount
-
     def __eq__(self, other):
         return self.amount == other.amount and self.currency == other.currency
 
@@ -285,6 +321,20 @@ class Transactions(abc.Sequence):
         pre_sum_debit_entries=[],
         post_sum_debit_entries=[])
 
+    #: The keys to search (in order) for the currency of the transactions
+    CURRENCY_KEYS = (
+        'final_opening_balance',
+        'opening_balance',
+        'intermediate_opening_balance',
+        'available_balance',
+        'forward_available_balance',
+        'final_closing_balance',
+        'closing_balance',
+        'intermediate_closing_balance',
+        'c_floor_limit',
+        'd_floor_limit',
+    )
+
     def __getstate__(self):  # pragma: no cover
         # Processors are not always safe to dump so ignore them entirely
         state = self.__dict__.copy()
@@ -305,23 +355,41 @@ class Transactions(abc.Sequence):
 
     @property
     def currency(self):
-        balance = mt940.utils.coalesce(
+        for key in self.CURRENCY_KEYS:
+            balance = self.data.get(key)
+            if balance is not None:
+                break
+        else:
+            return None
+
+        if isinstance(balance, Amount):
+            return balance.currency
+
+        return balance.amount.currency
+
+    def running_balance(self):
+        '''Calculate the balance after each transaction, starting from the
+        opening balance (or zero if no opening balance is available).
+
+        The summation uses `numba` when it is installed and the amounts fit
+        in 64 bit integers.
+
+        Returns: :py:class:`list` of :py:class:`decimal.Decimal`
+        '''
+        opening_balance = mt940.utils.coalesce(
             self.data.get('final_opening_balance'),
             self.data.get('opening_balance'),
-            self.data.get('intermediate_opening_balance'),
-            self.data.get('available_balance'),
-            self.data.get('forward_available_balance'),
-            self.data.get('final_closing_balance'),
-            self.data.get('closing_balance'),
-            self.data.get('intermediate_closing_balance'),
-            self.data.get('c_floor_limit'),
-            self.data.get('d_floor_limit'), )
+            self.data.get('intermediate_opening_balance'), )
 
-        if balance:
-            if isinstance(balance, Amount):
-                return balance.currency
+        if opening_balance:
+            start = opening_balance.amount.amount
+        else:
+            start = decimal.Decimal(0)
 
-            return balance.amount.currency
+        return _accel.running_balance(
+            (transaction.data['amount'].amount
+             for transaction in self.transactions),
+            start)
 
     @staticmethod
     def defaultTags():
@@ -332,7 +400,8 @@ class Transactions(abc.Sequence):
         for line in lines:
             # We don't like carriage returns in case of Windows files so let's
             # just replace them with nothing
-            line = line.replace('\r', '')
+            if '\r' in line:
+                line = line.replace('\r', '')
 
             # Strip trailing whitespace from lines since they cause incorrect
             # files
@@ -357,6 +426,7 @@ class Transactions(abc.Sequence):
         return tag_id
 
     def sanitize_tag_id_matches(self, matches):
+        transaction_details_id = mt940.tags.Tags.TRANSACTION_DETAILS.value.id
         i_next = 0
         for i, match in enumerate(matches):
             # match was rejected
@@ -376,7 +446,7 @@ class Transactions(abc.Sequence):
             # special treatment for long tag content with possible
             # bad line wrap which produces tag_id like line beginnings
             # seen with :86: tag
-            if tag_id == mt940.tags.Tags.TRANSACTION_DETAILS.value.id:
+            if tag_id == transaction_details_id:
                 # search subsequent tags for unknown tag ids
                 # these lines likely belong to the previous tag
                 for j in range(i_next, len(matches)):
@@ -399,21 +469,29 @@ class Transactions(abc.Sequence):
 
         Returns: :py:class:`list` of :py:class:`Transaction`
         '''
+        # Remove the carriage returns in a single pass over the document, the
+        # (common) case without them doesn't need a copy at all
+        if '\r' in data:
+            data = data.replace('\r', '')
+
         # Remove extraneous whitespace and such
         data = '\n'.join(self.strip(data.split('\n')))
 
         # The pattern is a bit annoying to match by regex, even with a greedy
         # match it's difficult to get both the beginning and the end so we're
         # working around it in a safer way to get everything.
-        tag_re = re.compile(
-            r'^:\n?(?P<full_tag>(?P<tag>[0-9]{2}|NS)(?P<sub_tag>[A-Z])?):',
-            re.MULTILINE)
         matches = list(tag_re.finditer(data))
 
         # identify valid matches
-        valid_matches = list(self.sanitize_tag_id_matches(matches))
+        valid_matches = self.sanitize_tag_id_matches(matches)
+
+        # The processors are resolved once per tag (on first use) instead of
+        # once per match
+        processors = {}
+
+        transaction = None
 
-        for i, match in enumerate(valid_matches):
+        for match, next_match in mt940.utils.with_next(valid_matches):
             tag_id = self.normalize_tag_id(match.group('tag'))
 
             # get tag instance corresponding to tag id
@@ -424,24 +502,29 @@ class Transactions(abc.Sequence):
             # regex matches have a `end()` and `start()` to indicate the start
             # and end index of the match.
 
-            if valid_matches[i + 1:i + 2]:
-                tag_data = \
-                    data[match.end():valid_matches[i + 1].start()].strip()
+            if next_match is not None:
+                tag_data = data[match.end():next_match.start()].strip()
             else:
                 tag_data = data[match.end():].strip()
 
             tag_dict = tag.parse(self, tag_data)
+            if tag.slug not in processors:
+                processors[tag.slug] = (
+                    self.processors.get('pre_%s' % tag.slug, []),
+                    self.processors.get('post_%s' % tag.slug, []),
+                )
+            pre_processors, post_processors = processors[tag.slug]
 
             # Preprocess data before creating the object
 
-            for processor in self.processors.get('pre_%s' % tag.slug, []):
+            for processor in pre_processors:
                 tag_dict = processor(self, tag, tag_dict)
 
             result = tag(self, tag_dict)
 
             # Postprocess the object
 
-            for processor in self.processors.get('post_%s' % tag.slug, []):
+            for processor in post_processors:
                 result = processor(self, tag, tag_dict, result)
 
             # Creating a new transaction for :20: and :61: tags allows the
@@ -452,11 +535,7 @@ class Transactions(abc.Sequence):
                 # :61: tag which is why a new transaction is created if the
                 # 'id' has a value.
 
-                if not self.transactions:
-                    transaction = Transaction(self)
-                    self.transactions.append(transaction)
-
-                if transaction.data.get('id'):
+                if transaction is None or transaction.data.get('id'):
                     transaction = Transaction(self, result)
                     self.transactions.append(transaction)
                 else:
@@ -465,7 +544,7 @@ class Transactions(abc.Sequence):
                 # Combine multiple results together as one string, Rabobank has
                 # multiple :86: tags for a single transaction
 
-                for k, v in _compat.iteritems(result):
+                for k, v in result.items():
                     if k in transaction.data and hasattr(v, 'strip'):
                         transaction.data[k] += '\n%s' % v.strip()
                     else:
@@ -479,6 +558,14 @@ class Transactions(abc.Sequence):
     def __getitem__(self, key):
         return self.transactions[key]
 
+    def __iter__(self):
+        # Iterate the list directly instead of going through `__getitem__`
+        # for every transaction like `abc.Sequence` does
+        return iter(self.transactions)
+
+    def __contains__(self, transaction):
+        return transaction in self.transactions
+
     def __len__(self):
         return len(self.transactions)
 
@@ -486,7 +573,7 @@ class Transactions(abc.Sequence):
         return '<%s[%s]>' % (
             self.__class__.__name__,
             ']['.join('%s: %s' % (k.replace('_balance', ''), v)
-                      for k, v in _compat.iteritems(self.data)
+                      for k, v in self.data.items()
                       if k.endswith('balance')))
 
 
@@ -27,6 +27,7 @@ Sources:
 '''
 
 import os
+import codecs
 
 import mt940
 
@@ -58,6 +59,15 @@ def parse(src, encoding=None, processors=None, tags=None):
         exception = None
         encodings = [encoding, 'utf-8', 'cp852', 'iso8859-15', 'latin1']
 
+        if not encoding:
+            if data.startswith(codecs.BOM_UTF8):
+                # Strip the byte order mark instead of leaving it in the data
+                encodings[0] = 'utf-8-sig'
+            elif data.isascii():
+                # Plain ASCII decodes identically with all of the encodings
+                # so there's no need to try them one by one
+                encodings[0] = 'ascii'
+
         for encoding in encodings:  # pragma: no cover
             if not encoding:
                 continue
@@ -1,10 +1,11 @@
 # encoding=utf-8
 import re
+import types
 import functools
 import calendar
-import collections
 
 
+@functools.lru_cache(maxsize=None)
 def add_currency_pre_processor(currency, overwrite=True):
     def _add_currency_pre_processor(transactions, tag, tag_dict, *args):
         if 'currency' not in tag_dict or overwrite:  # pragma: no branch
@@ -15,6 +16,11 @@ def add_currency_pre_processor(currency, overwrite=True):
     return _add_currency_pre_processor
 
 
+@functools.lru_cache(maxsize=None)
+def _february_days(year):
+    return 29 if calendar.isleap(year) else 28
+
+
 def date_fixup_pre_processor(transactions, tag, tag_dict, *args):
     """
     Replace illegal February 29, 30 dates with the last day of February.
@@ -23,36 +29,50 @@ def date_fixup_pre_processor(transactions, tag, tag_dict, *args):
     where each month has always 30 days even February. Python's datetime
     module won't accept such dates.
     """
-    if tag_dict['month'] == '02':
-        year = int(tag_dict['year'], 10)
-        _, max_month_day = calendar.monthrange(year, 2)
-        if int(tag_dict['day'], 10) > max_month_day:
-            tag_dict['day'] = str(max_month_day)
+    # Days up to the 28th are always valid so they don't need any parsing
+    if tag_dict['month'] != '02' or tag_dict['day'] <= '28':
+        return tag_dict
+
+    max_month_day = _february_days(int(tag_dict['year'], 10))
+    if int(tag_dict['day'], 10) > max_month_day:
+        tag_dict['day'] = str(max_month_day)
 
     return tag_dict
 
 
+#: The raw date fields that are removed by `date_cleanup_post_processor`
+_DATE_CLEANUP_KEYS = ('day', 'month', 'year', 'entry_day', 'entry_month')
+
+
 def date_cleanup_post_processor(transactions, tag, tag_dict, result):
-    for k in ('day', 'month', 'year', 'entry_day', 'entry_month'):
+    for k in _DATE_CLEANUP_KEYS:
         result.pop(k, None)
 
     return result
 
 
+transaction_code_re = re.compile(r'(\d+)[ ;]')
+
+
 def mBank_set_transaction_code(transactions, tag, tag_dict, *args):
     """
     mBank Collect uses transaction code 911 to distinguish icoming mass
     payments transactions, adding transaction_code may be helpful in further
     processing
     """
-    tag_dict['transaction_code'] = int(
-        tag_dict[tag.slug].split(';')[0].split(' ', 1)[0]
-    )
+    details = tag_dict[tag.slug]
+    match = transaction_code_re.match(details)
+    if match:
+        transaction_code = match.group(1)
+    else:
+        transaction_code = details.split(';')[0].split(' ', 1)[0]
+
+    tag_dict['transaction_code'] = int(transaction_code)
 
     return tag_dict
 
 
-iph_id_re = re.compile(r' ID IPH: X*(?P<iph_id>\d{0,14});')
+iph_id_re = re.compile(r' ID IPH: X*(?P<iph_id>\d{0,14});', re.ASCII)
 
 
 def mBank_set_iph_id(transactions, tag, tag_dict, *args):
@@ -63,15 +83,12 @@ def mBank_set_iph_id(transactions, tag, tag_dict, *args):
     matches = iph_id_re.search(tag_dict[tag.slug])
 
     if matches:  # pragma no branch
-        tag_dict['iph_id'] = matches.groupdict()['iph_id']
+        tag_dict['iph_id'] = matches.group('iph_id')
 
     return tag_dict
 
 
-tnr_re = re.compile(
-    r'TNR:[ \n](?P<tnr>\d+\.\d+)',
-    flags=re.MULTILINE | re.UNICODE
-)
+tnr_re = re.compile(r'TNR:[ \n](?P<tnr>\d+\.\d+)', re.ASCII)
 
 
 def mBank_set_tnr(transactions, tag, tag_dict, *args):
@@ -86,7 +103,7 @@ def mBank_set_tnr(transactions, tag, tag_dict, *args):
     matches = tnr_re.search(tag_dict[tag.slug])
 
     if matches:  # pragma no branch
-        tag_dict['tnr'] = matches.groupdict()['tnr']
+        tag_dict['tnr'] = matches.group('tnr')
 
     return tag_dict
 
@@ -105,6 +122,13 @@ DETAIL_KEYS = {
     '60': 'additional_purpose',
 }
 
+#: The result key for every segment type, the remaining segment types
+#: starting with a 2 are part of the purpose as well
+_SEGMENT_KEYS = dict(DETAIL_KEYS)
+_SEGMENT_KEYS['33'] = DETAIL_KEYS['32']
+_SEGMENT_KEYS.update(
+    dict.fromkeys(('61', '62', '63', '64', '65'), DETAIL_KEYS['60']))
+
 # https://www.hettwer-beratung.de/sepa-spezialwissen/sepa-technische-anforderungen/sepa-gesch%C3%A4ftsvorfallcodes-gvc-mt-940/
 GVC_KEYS = {
     '': 'purpose',
@@ -129,83 +153,85 @@ GVC_KEYS = {
 }
 
 
+# Recurring transactions often have identical details so the parsed results
+# are cached. The cached results are shared so they are returned as read-only
+# mappings, the callers copy them into their own results with `update()`.
+@functools.lru_cache(maxsize=1024)
 def _parse_mt940_details(detail_str, space=False):
-    result = collections.defaultdict(list)
+    result = {key: [] for key in DETAIL_KEYS.values()}
 
-    tmp = collections.OrderedDict()
-    segment = ''
+    tmp = {}
     segment_type = ''
+    index = 0
 
-    for index, char in enumerate(detail_str):
-        if char != '?':
-            segment += char
-            continue
-
+    # The last segment always ends the loop through the `break` below
+    for segment in detail_str.split('?'):  # pragma: no branch
+        # The position of the `?` following this segment
+        index += len(segment)
         if index + 2 >= len(detail_str):
             break
 
         tmp[segment_type] = segment if not segment_type else segment[2:]
-        segment_type = detail_str[index + 1] + detail_str[index + 2]
-        segment = ''
+        segment_type = detail_str[index + 1:index + 3]
+        index += 1
 
     if segment_type:  # pragma: no branch
         tmp[segment_type] = segment if not segment_type else segment[2:]
 
+    get_segment_key = _SEGMENT_KEYS.get
     for key, value in tmp.items():
-        if key in DETAIL_KEYS:
-            result[DETAIL_KEYS[key]].append(value)
-        elif key == '33':
-            key32 = DETAIL_KEYS['32']
-            result[key32].append(value)
-        elif key.startswith('2'):
-            key20 = DETAIL_KEYS['20']
-            result[key20].append(value)
-        elif key in {'60', '61', '62', '63', '64', '65'}:
-            key60 = DETAIL_KEYS['60']
-            result[key60].append(value)
-
-    joined_result = dict()
-    for key in DETAIL_KEYS.values():
-        if space:
-            value = ' '.join(result[key])
-        else:
-            value = ''.join(result[key])
+        segment_key = get_segment_key(key)
+        if segment_key is None and key.startswith('2'):
+            segment_key = DETAIL_KEYS['20']
 
-        joined_result[key] = value or None
+        if segment_key is not None:
+            result[segment_key].append(value)
 
-    return joined_result
+    separator = ' ' if space else ''
+    return types.MappingProxyType({
+        key: separator.join(values) or None
+        for key, values in result.items()
+    })
 
 
-def _parse_mt940_gvcodes(purpose):
-    result = {}
+#: The actual GVC keys, without the empty key for the text before them
+_GVC_NONEMPTY_KEYS = tuple(key for key in GVC_KEYS if key)
 
-    for key, value in GVC_KEYS.items():
-        result[value] = None
+#: All GVC keys without a value, copied for every purpose that is parsed
+_GVC_RESULT = dict.fromkeys(GVC_KEYS.values())
 
-    tmp = {}
-    segment_type = None
-    text = ''
-
-    for index, char in enumerate(purpose):
-        if char == '+' and purpose[index - 4:index] in GVC_KEYS:
-            if segment_type:
-                tmp[segment_type] = text[:-4]
-                text = ''
-            else:
-                text = ''
-            segment_type = purpose[index - 4:index]
-        else:
-            text += char
+gvc_keys_re = re.compile('|'.join(_GVC_NONEMPTY_KEYS))
+gvc_re = re.compile('(%s)\\+' % '|'.join(_GVC_NONEMPTY_KEYS))
 
-    if segment_type:  # pragma: no branch
-        tmp[segment_type] = text
-    else:
-        tmp[''] = text  # pragma: no cover
+
+@functools.lru_cache(maxsize=1024)
+def _parse_mt940_gvcodes(purpose):
+    result = _GVC_RESULT.copy()
+
+    # Without a `+` there are no keys so the purpose is used as is
+    if '+' not in purpose:
+        result['purpose'] = purpose
+        return types.MappingProxyType(result)
+
+    # Splitting on the (captured) keys gives the text before the first key
+    # followed by alternating keys and values
+    parts = gvc_re.split(purpose)
+
+    if len(parts) > 1:  # pragma: no branch
+        # The text before the first key is discarded
+        tmp = dict(zip(parts[1::2], parts[2::2]))
+    else:  # pragma: no cover
+        # A `+` within the first 4 characters restarts the text
+        if len(purpose) >= 4:
+            start = purpose.rfind('+', 0, 4) + 1
+        else:
+            start = int(purpose.startswith('+'))
+        tmp = {'': purpose[start:]}
 
     for key, value in tmp.items():
         result[GVC_KEYS[key]] = value
 
-    return result
+    return types.MappingProxyType(result)
 
 
 def transaction_details_post_processor(
@@ -221,18 +247,16 @@ def transaction_details_post_processor(
         space (bool): include spaces between lines in the mt940 details
     '''
     details = tag_dict['transaction_details']
-    details = ''.join(detail.strip('\n\r') for detail in details.splitlines())
+    details = ''.join(details.splitlines())
 
     # check for e.g. 103?00...
-    if re.match(r'^\d{3}\?\d{2}', details):
+    if len(details) >= 6 and details[3] == '?' \
+            and details[:3].isdecimal() and details[4:6].isdecimal():
         result.update(_parse_mt940_details(details, space=space))
 
         purpose = result.get('purpose')
 
-        if purpose and any(
-            gvk in purpose for gvk in GVC_KEYS
-            if gvk != ''
-        ):  # pragma: no branch
+        if purpose and gvc_keys_re.search(purpose):  # pragma: no branch
             result.update(_parse_mt940_gvcodes(result['purpose']))
 
         del result['transaction_details']
@@ -245,6 +269,7 @@ transaction_details_post_processor_with_space = functools.partial(
 )
 
 
+@functools.lru_cache(maxsize=None)
 def transactions_to_transaction(*keys):
     '''Copy the global transactions details to the transaction.
 
@@ -260,9 +285,10 @@ def transactions_to_transaction(*keys):
             tag_dict (dict): dict with the raw tag details
             result (dict): the resulting tag dict
         '''
+        data = transactions.data
         for key in keys:
-            if key in transactions.data:
-                result[key] = transactions.data[key]
+            if key in data:
+                result[key] = data[key]
 
         return result
 
@@ -72,47 +72,56 @@ The pattern for the tags use the following syntax:
     c = Code list value
     n = Numeric
 '''
-from __future__ import print_function
-
+import enum
 import logging
 import re
 
-try:
-    import enum
-except ImportError:  # pragma: no cover
-    import sys
-
-    print('MT940 requires the `enum34` package', file=sys.stderr)
-
-    class enum(object):
-        @staticmethod
-        def unique(*args, **kwargs):
-            return []
-
-        Enum = object
-
 from . import models
 
 logger = logging.getLogger(__name__)
 
+#: The flags for the patterns without any letters, there is no case to ignore
+_NUMERIC_RE_FLAGS = re.VERBOSE | re.UNICODE
+
 
 class Tag(object):
     id = 0
     RE_FLAGS = re.IGNORECASE | re.VERBOSE | re.UNICODE
     scope = models.Transactions
 
-    def __init__(self):
-        self.re = re.compile(self.pattern, self.RE_FLAGS)
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        cls.name = cls.__name__
+
+        words = re.findall('([A-Z][a-z]+)', cls.__name__)
+        cls.slug = '_'.join(w.lower() for w in words)
+        cls.logger = logger.getChild(cls.name)
+        cls._hash = hash(cls.id)
+
+        # Compile the pattern once per class instead of once per instance,
+        # subclasses that don't change the pattern or flags inherit it
+        if 'pattern' in cls.__dict__ or 'RE_FLAGS' in cls.__dict__:
+            cls.re = re.compile(cls.pattern, cls.RE_FLAGS)
+            cls._match = cls.re.match
 
     def parse(self, transactions, value):
-        match = self.re.match(value)
+        match = self._match(value)
         if match:  # pragma: no branch
-            self.logger.debug(
-                'matched (%d) %r against "%s", got: %s',
-                len(value), value, self.pattern,
-                match.groupdict()
-            )
+            data = match.groupdict()
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    'matched (%d) %r against "%s", got: %s',
+                    len(value), value, self.pattern, data
+                )
+            return data
         else:  # pragma: no cover
+            self._diagnose(value)
+
+    def _diagnose(self, value):  # pragma: no cover
+        # Explain which part of the pattern failed to match and raise, this is
+        # only used for values that don't match at all
+        if self.logger.isEnabledFor(logging.ERROR):
             self.logger.error(
                 'matching id=%s (len=%d) "%s" against\n    %s',
                 self.id,
@@ -137,26 +146,16 @@ class Tag(object):
                         pattern, part_value
                     )
 
-            raise RuntimeError(
-                'Unable to parse %r from %r' % (self, value),
-                self, value
-            )
-        return match.groupdict()
+        raise RuntimeError(
+            'Unable to parse %r from %r' % (self, value),
+            self, value
+        )
 
     def __call__(self, transactions, value):
         return value
 
-    def __new__(cls, *args, **kwargs):
-        cls.name = cls.__name__
-
-        words = re.findall('([A-Z][a-z]+)', cls.__name__)
-        cls.slug = '_'.join(w.lower() for w in words)
-        cls.logger = logger.getChild(cls.name)
-
-        return object.__new__(cls, *args, **kwargs)
-
     def __hash__(self):
-        return self.id
+        return self._hash
 
 
 class DateTimeIndication(Tag):
@@ -165,6 +164,7 @@ class DateTimeIndication(Tag):
     Pattern: 6!n4!n1! x4!n
     '''
     id = 13
+    RE_FLAGS = _NUMERIC_RE_FLAGS
     pattern = r'''^
     (?P<year>\d{2})
     (?P<month>\d{2})
@@ -218,6 +218,7 @@ class StatementNumber(Tag):
     Pattern: 5n[/5n]
     '''
     id = 28
+    RE_FLAGS = _NUMERIC_RE_FLAGS
     pattern = r'''
     (?P<statement_number>\d{1,5})  # 5n
     (?:/?(?P<sequence_number>\d{1,5}))?  # [/5n]
@@ -239,18 +240,17 @@ class FloorLimitIndicator(Tag):
 
     def __call__(self, transactions, value):
         data = super(FloorLimitIndicator, self).__call__(transactions, value)
+        amount = data['amount']
+        currency = data['currency']
         if data['status']:
             return {
-                data['status'].lower() + '_floor_limit': models.Amount(**data)
+                data['status'].lower() + '_floor_limit': models.Amount(
+                    amount, data['status'], currency)
             }
 
-        data_d = data.copy()
-        data_c = data.copy()
-        data_d.update({'status': 'D'})
-        data_c.update({'status': 'C'})
         return {
-            'd_floor_limit': models.Amount(**data_d),
-            'c_floor_limit': models.Amount(**data_c)
+            'd_floor_limit': models.Amount(amount, 'D', currency),
+            'c_floor_limit': models.Amount(amount, 'C', currency)
         }
 
 
@@ -295,9 +295,9 @@ class NonSwift(Tag):
         for line in data.split('\n'):
             frag = self.sub_pattern_m.match(line)
             if frag and frag.group(2):
-                ns = frag.groupdict()
-                value['non_swift_' + ns['ns_id']] = ns['ns_data']
-                text.append(ns['ns_data'])
+                ns_id, ns_data = frag.group('ns_id', 'ns_data')
+                value['non_swift_' + ns_id] = ns_data
+                text.append(ns_data)
             elif len(text) and text[-1]:
                 text.append('')
             elif line.strip():
@@ -322,12 +322,35 @@ class BalanceBase(Tag):
     (?P<amount>[0-9,]{0,16})  # 15d Amount (includes decimal sign, so 16)
     '''
 
+    def parse(self, transactions, value):
+        # The balance has a fixed layout so the common (valid) values can
+        # simply be sliced, anything unusual is left to the regular expression
+        # as are subclasses with a different pattern
+        amount = value[10:]
+        if type(self)._match is BalanceBase._match and len(value) > 10 \
+                and len(amount) <= 16 and value[0] in 'CD' \
+                and value[1:7].isascii() and value[1:7].isdigit() \
+                and '\n' not in value[7:10] and amount.isascii() \
+                and amount.replace(',', '').isdigit():
+            return dict(
+                status=value[0],
+                year=value[1:3],
+                month=value[3:5],
+                day=value[5:7],
+                currency=value[7:10],
+                amount=amount,
+            )
+
+        return super(BalanceBase, self).parse(transactions, value)
+
     def __call__(self, transactions, value):
         data = super(BalanceBase, self).__call__(transactions, value)
-        data['amount'] = models.Amount(**data)
-        data['date'] = models.Date(**data)
+        amount = data['amount'] = models.Amount(
+            data['amount'], data['status'], data.get('currency'))
+        date = data['date'] = models.Date(
+            year=data['year'], month=data['month'], day=data['day'])
         return {
-            self.slug: models.Balance(**data)
+            self.slug: models.Balance(data['status'], amount, date)
         }
 
 
@@ -392,9 +415,9 @@ class Statement(Tag):
     # cuscal can also send a space here as well
     (?P<amount>[\d,]{1,15})  # 15d Amount
     (?P<id>[A-Z][A-Z0-9 ]{3})?  # 1!a3!c Transaction Type Identification Code
-    # We need the (slow) repeating negative lookahead to search for // so we
-    # don't acciddntly include the bank reference in the customer reference.
-    (?P<customer_reference>((?!//)[^\n]){0,16})  # 16x Customer Reference
+    # Only allow a / when it isn't followed by another / so we don't
+    # accidentally include the bank reference in the customer reference.
+    (?P<customer_reference>(?:[^/\n]|/(?!/)){0,16})  # 16x Customer Reference
     (//(?P<bank_reference>.{0,23}))?  # [//23x] Bank Reference
     (\n?(?P<extra_details>.{0,34}))?  # [34x] Supplementary Details
     $'''
@@ -403,19 +426,28 @@ class Statement(Tag):
         data = super(Statement, self).__call__(transactions, value)
         data.setdefault('currency', transactions.currency)
 
-        data['amount'] = models.Amount(**data)
-        date = data['date'] = models.Date(**data)
-
-        if data.get('entry_day') and data.get('entry_month'):
+        data['amount'] = models.Amount(
+            data['amount'], data['status'], data['currency'])
+        date = data['date'] = models.Date(
+            year=data['year'], month=data['month'], day=data['day'])
+
+        entry_day = data.get('entry_day')
+        entry_month = data.get('entry_month')
+        if entry_day == data['day'] and entry_month == data['month']:
+            # The entry date is (commonly) the same as the value date so the
+            # guessed entry date is the same date as well
+            data['entry_date'] = data['guessed_entry_date'] = date
+        elif entry_day and entry_month:
             entry_date = data['entry_date'] = models.Date(
-                day=data.get('entry_day'),
-                month=data.get('entry_month'),
-                year=str(data['date'].year),
+                day=entry_day,
+                month=entry_month,
+                year=str(date.year),
             )
 
-            if date > entry_date and (date - entry_date).days >= 330:
+            days = date.toordinal() - entry_date.toordinal()
+            if days >= 330:
                 year = 1
-            elif entry_date > date and (entry_date - date).days >= 330:
+            elif days <= -330:
                 year = -1
             else:
                 year = 0
@@ -505,6 +537,7 @@ class SumEntries(Tag):
     '''
 
     id = 90
+    RE_FLAGS = _NUMERIC_RE_FLAGS
     pattern = r'''^
     (?P<number>\d*)
     (?P<currency>.{3})  # 3!a Currency
@@ -516,7 +549,9 @@ class SumEntries(Tag):
 
         data['status'] = self.status
         return {
-            self.slug: models.SumAmount(**data)
+            self.slug: models.SumAmount(
+                data['amount'], data['status'], data['currency'],
+                number=data['number'])
         }
 
 
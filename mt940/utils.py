@@ -1,3 +1,4 @@
+import re
 import enum
 
 
@@ -18,6 +19,34 @@ def coalesce(*args):
             return arg
 
 
+#: Marks the end of the input in `with_next`, `None` is a valid item
+_SENTINEL = object()
+
+
+def with_next(iterable):
+    '''
+    Yield every item together with the item following it, `None` is used as
+    the next item for the last item
+
+    >>> list(with_next([]))
+    []
+    >>> list(with_next('ab'))
+    [('a', 'b'), ('b', None)]
+    >>> list(with_next([None, 1]))
+    [(None, 1), (1, None)]
+    '''
+    iterator = iter(iterable)
+    previous = next(iterator, _SENTINEL)
+    if previous is _SENTINEL:
+        return
+
+    for item in iterator:
+        yield previous, item
+        previous = item
+
+    yield previous, None
+
+
 class Strip(enum.IntEnum):
     NONE = 0
     LEFT = 1
@@ -25,19 +54,26 @@ class Strip(enum.IntEnum):
     BOTH = 3
 
 
+#: The line boundaries recognised by :py:meth:`str.splitlines`
+_LINE_BOUNDARIES = '\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029'
+
+#: The line boundaries and the whitespace to strip around them per strip mode
+_join_lines_res = {
+    Strip.NONE: re.compile('[%s]' % _LINE_BOUNDARIES),
+    Strip.LEFT: re.compile(r'[%s]\s*' % _LINE_BOUNDARIES),
+    Strip.RIGHT: re.compile(r'\s*[%s]' % _LINE_BOUNDARIES),
+    Strip.BOTH: re.compile(r'\s*[%s]\s*' % _LINE_BOUNDARIES),
+}
+
+
 def join_lines(string, strip=Strip.BOTH):
     '''
     Join strings together and strip whitespace in between if needed
     '''
-    lines = []
-
-    for line in string.splitlines():
-        if strip & Strip.RIGHT:
-            line = line.rstrip()
-
-        if strip & Strip.LEFT:
-            line = line.lstrip()
+    if strip & Strip.LEFT:
+        string = string.lstrip()
 
-        lines.append(line)
+    if strip & Strip.RIGHT:
+        string = string.rstrip()
 
-    return ''.join(lines)
+    return _join_lines_res[strip & Strip.BOTH].sub('', string)
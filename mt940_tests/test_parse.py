@@ -1,3 +1,5 @@
+import codecs
+import decimal
 import pathlib
 import pytest
 import mt940
@@ -23,3 +25,98 @@ def test_non_ascii_parse(path, encoding):
     with path.open('r') as fh:
         data = fh.read()
         mt940.parse(data)
+
+
+def test_running_balance():
+    transactions = mt940.parse(_tests_path / 'mBank' / 'mt940.sta')
+    balances = transactions.running_balance()
+    assert len(balances) == len(transactions)
+    assert balances[-1] == \
+        transactions.data['final_closing_balance'].amount.amount
+
+    transactions = mt940.models.Transactions()
+    assert transactions.running_balance() == []
+
+
+def test_running_balance_scaled(monkeypatch):
+    transactions = mt940.parse(_tests_path / 'mBank' / 'mt940.sta')
+    expected = transactions.running_balance()
+
+    # Use the (uncompiled) numba kernel
+    monkeypatch.setattr(
+        mt940._accel, '_load_running_total',
+        lambda: mt940._accel._running_total)
+    assert transactions.running_balance() == expected
+
+
+def test_running_balance_numba():
+    pytest.importorskip('numba')
+    assert mt940._accel._load_running_total() is not None
+
+    transactions = mt940.parse(_tests_path / 'mBank' / 'mt940.sta')
+    amounts = [t.data['amount'].amount for t in transactions]
+    start = transactions.data['final_opening_balance'].amount.amount
+    assert mt940._accel.running_balance(amounts, start) == \
+        mt940._accel._running_balance_python(amounts, start)
+
+
+@pytest.mark.parametrize('amounts', [
+    # The totals don't fit in 64 bit integers
+    ['4611686018427387904', '4611686018427387904'],
+    # Too precise to scale to 64 bit integers
+    ['0.' + '1' * 30],
+    ['Infinity'],
+])
+def test_running_balance_scaled_fallback(monkeypatch, amounts):
+    def running_total(values, start):  # pragma: no cover
+        raise AssertionError('The amounts should not be scaled')
+
+    monkeypatch.setattr(
+        mt940._accel, '_load_running_total', lambda: running_total)
+    amounts = [decimal.Decimal(amount) for amount in amounts]
+    assert mt940._accel.running_balance(amounts) == \
+        mt940._accel._running_balance_python(amounts, decimal.Decimal(0))
+
+
+@pytest.mark.parametrize('prefix,encoding', [
+    (b'', None),
+    (b'', 'utf-8'),
+    (codecs.BOM_UTF8, None),
+])
+def test_parse_bytes(prefix, encoding):
+    path = _tests_path / 'jejik' / 'abnamro.sta'
+    with path.open('rb') as fh:
+        data = fh.read()
+
+    expected = mt940.parse(data.decode('utf-8'))
+    transactions = mt940.parse(prefix + data, encoding=encoding)
+    assert transactions.data == expected.data
+    assert len(transactions) == len(expected)
+
+
+def test_parse_statements_without_id():
+    # Statement lines without a transaction type identification code are
+    # merged into the current transaction
+    transactions = mt940.parse('\n'.join((
+        ':20:STARTUMS',
+        ':60F:C200101EUR100,00',
+        ':61:2001010101C10,00',
+        ':61:2001010101C20,00',
+        ':62F:C200101EUR130,00',
+    )))
+    assert len(transactions) == 1
+    assert list(transactions) == transactions.transactions
+    assert transactions[0] in transactions
+    assert transactions[0].data['amount'] == mt940.models.Amount(
+        '20.00', 'C', 'EUR')
+
+
+def test_transaction_without_data():
+    transactions = mt940.models.Transactions()
+    assert mt940.models.Transaction(transactions).data == {}
+
+
+def test_strip_carriage_returns():
+    lines = [':20:STARTUMS\r', '-\r', ':60F:C200101EUR100,00\r\n', '\r']
+    assert list(mt940.models.Transactions.strip(lines)) == [
+        ':20:STARTUMS', ':60F:C200101EUR100,00']
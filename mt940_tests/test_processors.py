@@ -7,16 +7,14 @@ import mt940
 _tests_path = pathlib.Path(__file__).parent
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def sta_data():
-    with (_tests_path / 'jejik' / 'abnamro.sta').open() as fh:
-        return fh.read()
+    return (_tests_path / 'jejik' / 'abnamro.sta').read_text()
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def february_30_data():
-    with (_tests_path / 'self-provided' / 'february_30.sta').open() as fh:
-        return fh.read()
+    return (_tests_path / 'self-provided' / 'february_30.sta').read_text()
 
 
 def test_date_fixup_pre_processor(february_30_data):
@@ -29,6 +27,19 @@ def test_date_fixup_pre_processor(february_30_data):
     assert transactions[0].data['date'] == mt940.models.Date(2016, 2, 29)
 
 
+@pytest.mark.parametrize('year,month,day,expected', [
+    ('16', '01', '31', '31'),
+    ('16', '02', '28', '28'),
+    ('16', '02', '29', '29'),
+    ('16', '02', '30', '29'),
+    ('17', '02', '30', '28'),
+])
+def test_date_fixup_pre_processor_days(year, month, day, expected):
+    tag_dict = mt940.processors.date_fixup_pre_processor(
+        None, None, dict(year=year, month=month, day=day))
+    assert tag_dict['day'] == expected
+
+
 def test_parse_data():
     with (_tests_path / 'jejik' / 'abnamro.sta').open() as fh:
         mt940.parse(fh.read())
@@ -71,10 +82,9 @@ def test_post_processor(sta_data):
     assert 'closing_balance_day' not in transactions.data
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def mBank_mt942_data():
-    with (_tests_path / 'mBank' / 'mt942.sta').open() as fh:
-        return fh.read()
+    return (_tests_path / 'mBank' / 'mt942.sta').read_text()
 
 
 def test_mBank_processors(mBank_mt942_data):
@@ -109,10 +119,57 @@ def test_transaction_details_post_processor_with_space():
         transaction['end_to_end_reference']
 
 
-@pytest.fixture
+@pytest.mark.parametrize('details,transaction_code', [
+    ('911 ID IPH: X000000000001;', 911),
+    ('911;TNR: 179171073864111.010001', 911),
+    ('911', 911),
+    ('+911;', 911),
+])
+def test_mBank_set_transaction_code(details, transaction_code):
+    tag = mt940.tags.TransactionDetails()
+    tag_dict = mt940.processors.mBank_set_transaction_code(
+        None, tag, {tag.slug: details})
+    assert tag_dict['transaction_code'] == transaction_code
+
+
+def test_transaction_details_post_processor_without_gvc_separator():
+    details = '166?00GUTSCHRIFT?20EREF NOTPROVIDED'
+    result = mt940.processors.transaction_details_post_processor(
+        None, None, dict(transaction_details=details),
+        dict(transaction_details=details))
+    assert result['posting_text'] == 'GUTSCHRIFT'
+    assert result['purpose'] == 'EREF NOTPROVIDED'
+    assert result['end_to_end_reference'] is None
+    assert 'transaction_details' not in result
+
+
+@pytest.mark.parametrize('details', [
+    '166?00GUTSCHRIFT?20EREF NOTPROVIDED',
+    '166?00GUTSCHRIFT?20EREF+NOTPROVIDED',
+    '166?00GUTSCHRIFT?20EREF+NOTPROVIDED SVWZ+Rechnung',
+])
+def test_transaction_details_post_processor_cached_results(details):
+    def post_process():
+        return mt940.processors.transaction_details_post_processor(
+            None, None, dict(transaction_details=details),
+            dict(transaction_details=details))
+
+    result = post_process()
+    expected = dict(result)
+    result['posting_text'] = 'changed'
+    result['purpose'] = 'changed'
+    assert post_process() == expected
+
+    with pytest.raises(TypeError):
+        mt940.processors._parse_mt940_details(details)['purpose'] = None
+
+    with pytest.raises(TypeError):
+        mt940.processors._parse_mt940_gvcodes(details)['purpose'] = None
+
+
+@pytest.fixture(scope='session')
 def mBank_with_newline_in_tnr():
-    with (_tests_path / 'mBank' / 'with_newline_in_tnr.sta').open() as fh:
-        return fh.read()
+    return (_tests_path / 'mBank' / 'with_newline_in_tnr.sta').read_text()
 
 
 def test_mBank_set_tnr_parses_tnr_with_newlines(mBank_with_newline_in_tnr):
@@ -5,10 +5,10 @@ import mt940
 import pytest
 import decimal
 import logging
+import functools
+import pathlib
 import datetime
 
-from mt940 import _compat
-
 try:
     from yaml import CLoader as Loader, CDumper as Dumper
 except ImportError:
@@ -18,25 +18,46 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
-try:  # pragma: no cover
-    string_type = unicode
-except NameError:
-    string_type = str
+_tests_path = pathlib.Path(__file__).parent
+
+# Collect the test files once for all the tests using them, the pattern
+# matches the extension case insensitively
+_STA_PATHS = sorted(_tests_path.rglob('*.[sS][tT][aA]'))
+_STA_FILES = tuple(os.path.relpath(path) for path in _STA_PATHS)
+# The test ids are relative to the test directory since the file names
+# themselves are not unique
+_STA_IDS = tuple(
+    path.relative_to(_tests_path).as_posix() for path in _STA_PATHS)
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml_date(*args):
+    return mt940.models.Date(*args)
+
+
+def _construct_date(loader, node):
+    # Most dates occur many times so they are created once and shared
+    return _yaml_date(*loader.construct_sequence(node))
+
+
+# The yaml files contain python objects so the safe loaders can't be used
+class _YamlLoader(Loader):
+    pass
+
 
+_YamlLoader.add_constructor(
+    'tag:yaml.org,2002:python/object/apply:mt940.models.Date',
+    _construct_date)
 
-def get_sta_files():
-    base_path = os.path.relpath(os.path.dirname(__file__))
-    for path, dirs, files in os.walk(base_path):
-        for file in files:
-            _, ext = os.path.splitext(file)
-            if ext.lower() == '.sta':
-                yield os.path.join(path, file)
+
+@functools.lru_cache(maxsize=None)
+def _load_yaml(yml_file):
+    with open(yml_file, 'rb') as fh:
+        return yaml.load(fh, Loader=_YamlLoader)
 
 
 def get_yaml_data(sta_file):
-    yml_file = sta_file.replace('.sta', '.yml')
-    with open(yml_file) as fh:
-        return yaml.load(fh, Loader=Loader)
+    return _load_yaml(sta_file.replace('.sta', '.yml'))
 
 
 def write_yaml_data(sta_file, data):
@@ -45,50 +66,92 @@ def write_yaml_data(sta_file, data):
         fh.write(yaml.dump(data, Dumper=Dumper))
 
 
-def compare(a, b, key=''):
-    if key:
-        keys = [key]
-    else:
-        keys = []
-
-    simple_types = (
-        datetime.datetime,
-        decimal.Decimal,
-    ) + _compat.integer_types
-    if isinstance(a, simple_types):
-        assert a == b
-    elif isinstance(a, _compat.string_types):
-        if _compat.PY2:
-            if not isinstance(a, _compat.text_type):
-                a = a.decode('utf-8', 'replace')
-
-            if not isinstance(b, _compat.text_type):
-                b = b.decode('utf-8', 'replace')
-
-        assert a == b
-
-    elif a is None:
-        assert a is b
-    elif isinstance(a, dict):
-        for k in a:
-            assert k in b
-            compare(a[k], b[k], '.'.join(keys + [k]))
+def _path(keys):
+    # Only used for the assertion messages so it's only built on failure
+    return '.'.join(map(str, keys))
+
+
+# The comparison functions add the nested values that still need comparing
+# to the stack instead of recursing
+def _compare_simple(a, b, keys, stack):
+    assert a == b, _path(keys)
+
+
+def _compare_none(a, b, keys, stack):
+    assert a is b, _path(keys)
 
-    elif isinstance(a, (list, tuple)):
-        for av, bv in zip(a, b):
-            compare(av, bv, key)
 
+def _compare_dict(a, b, keys, stack):
+    # The parsed data is allowed to have keys that are not in the yaml files
+    assert not a.keys() - b.keys(), _path(keys)
+    for k, v in a.items():
+        stack.append((v, b[k], keys + (k,)))
+
+
+def _compare_sequence(a, b, keys, stack):
+    stack.extend((av, bv, keys) for av, bv in zip(a, b))
+
+
+def _compare_data(a, b, keys, stack):
+    stack.append((a.data, b.data, keys + ('data',)))
+
+
+def _compare_model(a, b, keys, stack):
+    stack.append((a.__dict__, b.__dict__, keys))
+
+
+_SIMPLE_TYPES = (
+    datetime.datetime,
+    decimal.Decimal,
+    int,
+    str,
+)
+
+# The comparison for the exact types, subclasses are handled by `_get_compare`
+_COMPARE_BY_TYPE = {
+    type(None): _compare_none,
+    dict: _compare_dict,
+    list: _compare_sequence,
+    tuple: _compare_sequence,
+}
+_COMPARE_BY_TYPE.update(dict.fromkeys(_SIMPLE_TYPES, _compare_simple))
+
+
+def _get_compare(a):
+    compare_ = _COMPARE_BY_TYPE.get(type(a))
+    if compare_ is not None:
+        return compare_
+    elif isinstance(a, _SIMPLE_TYPES):
+        return _compare_simple
+    elif isinstance(a, dict):
+        return _compare_dict
+    elif isinstance(a, (list, tuple)):
+        return _compare_sequence
     elif hasattr(a, 'data'):
-        compare(a.data, b.data, '.'.join(keys + ['data']))
+        return _compare_data
     elif isinstance(a, mt940.models.Model):
-        compare(a.__dict__, b.__dict__)
+        return _compare_model
     else:
         raise TypeError('Unsupported type %s' % type(a))
 
 
-@pytest.mark.parametrize('sta_file', get_sta_files())
-def test_parse(sta_file):
-    transactions = mt940.parse(sta_file)
+def compare(a, b, keys=()):
+    stack = [(a, b, keys)]
+    while stack:
+        a, b, keys = stack.pop()
+        # Identical objects (e.g. shared cached values) are always equal
+        if a is not b:
+            _get_compare(a)(a, b, keys, stack)
+
+
+@pytest.fixture(scope='session', params=_STA_FILES, ids=_STA_IDS)
+def parsed(request):
+    '''The sta file and its transactions, parsed once for all the tests'''
+    return request.param, mt940.parse(request.param)
+
+
+def test_parse(parsed):
+    sta_file, transactions = parsed
     # To update the yaml files after changing the code use the following
     # environment variable.
     # NOTE: Only for development purposes
@@ -101,18 +164,15 @@ def test_parse(sta_file):
     repr(transactions)
     str(transactions)
 
-    # Test string and representation methods
-    for k, v in transactions.data.items():
-        string_type(v)
+    # Test the representation methods, str falls back to them
+    for v in transactions.data.values():
         repr(v)
 
-    # Test string and representation methods
     for transaction in transactions:
         repr(transaction)
-        string_type(transaction)
+        str(transaction)
 
-        for k, v in transaction.data.items():
-            string_type(v)
+        for v in transaction.data.values():
             repr(v)
 
     # Compare transaction data
@@ -121,7 +181,6 @@ def test_parse(sta_file):
     compare(expected[:], transactions[:])
 
 
-@pytest.mark.parametrize('sta_file', get_sta_files())
-def test_json_dump(sta_file):
-    transactions = mt940.parse(sta_file)
+def test_json_dump(parsed):
+    sta_file, transactions = parsed
     json.dumps(transactions, cls=mt940.JSONEncoder)
@@ -1,20 +1,18 @@
+import logging
 import pathlib
 
 import pytest
 import mt940
 from mt940 import tags
 from mt940 import models
-import pprint
 
 _tests_path = pathlib.Path(__file__).parent
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def long_statement_number():
-    with (
-        _tests_path / 'self-provided' / 'long_statement_number.sta').open() \
-            as fh:
-        return fh.read()
+    path = _tests_path / 'self-provided' / 'long_statement_number.sta'
+    return path.read_text()
 
 
 class MyStatementNumber(tags.Tag):
@@ -40,12 +38,10 @@ def test_specify_different_tag_classes(long_statement_number):
     assert transactions.data.get('statement_number') == '1810118101'
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def ASNB_mt940_data():
-    with (
-        _tests_path / 'ASNB' / '0708271685_09022020_164516.940.txt').open() \
-            as fh:
-        return fh.read()
+    path = _tests_path / 'ASNB' / '0708271685_09022020_164516.940.txt'
+    return path.read_text()
 
 
 def test_ASNB_tags(ASNB_mt940_data):
@@ -78,11 +74,6 @@ def test_ASNB_tags(ASNB_mt940_data):
     # test first entry
     td = trs.transactions[0].data.pop('transaction_details')
 
-    pprint.pprint(trs.data)
-    pprint.pprint(trs.data['final_opening_balance'])
-    pprint.pprint(type(trs.data['final_opening_balance']))
-    pprint.pprint(trs.data['final_opening_balance'].__dict__)
-
     assert trs.transactions[0].data == {
         'status': 'D',
         'funds_code': None,
@@ -138,3 +129,41 @@ def test_ASNB_tags(ASNB_mt940_data):
            '000000000000000000000000000000000 0000000000000000 Betaling aan I'
     assert td[113:176] == \
            'CS 99999999999 ICS Referentie: 2020-01-31 21:27 000000000000000'
+
+
+@pytest.mark.parametrize('value', [
+    'C200101EUR100,00',
+    'D991231USD0,',
+    'C200101EUR1234567890123,45',
+    'c200101EUR100,00',
+    'C200101EUR',
+    'C200101EUR12345678901234,567',
+    'C200101EUR100,00 extra',
+])
+def test_balance_parse(value):
+    tag = tags.OpeningBalance()
+    assert tag.parse(None, value) == tag.re.match(value).groupdict()
+
+
+class TrailingXClosingBalance(tags.ClosingBalance):
+    pattern = tags.ClosingBalance.pattern + 'X$'
+
+
+def test_balance_parse_custom_pattern():
+    tag = TrailingXClosingBalance()
+    assert tag.parse(None, 'C160101EUR100,00X')['amount'] == '100,00'
+    with pytest.raises(RuntimeError):
+        tag.parse(None, 'C160101EUR100,00')
+
+
+def test_parse_debug_logging(caplog):
+    caplog.set_level(logging.DEBUG, logger='mt940')
+    tag = tags.TransactionReferenceNumber()
+    assert tag.parse(None, 'STARTUMS') == dict(
+        transaction_reference='STARTUMS')
+    assert 'matched (8)' in caplog.text
+
+
+def test_tag_hash():
+    assert hash(tags.Statement()) == hash(61)
+    assert hash(tags.FinalOpeningBalance()) == hash('60F')
@@ -8,6 +8,10 @@ from mt940 import utils
     (' a \n b ', utils.Strip.LEFT, 'a b '),
     (' a \n b ', utils.Strip.RIGHT, ' a b'),
     (' a \n b ', utils.Strip.NONE, ' a  b '),
+    (' a \r\n\x0b b\u2028', None, 'ab'),
+    (' a \r\n \n b ', utils.Strip.LEFT, 'a b '),
+    (' a \r\n \n b ', utils.Strip.RIGHT, ' a b'),
+    (' a \r\n \n b ', utils.Strip.NONE, ' a   b '),
 
 ])
 def test_join_lines(input_, flags, output):
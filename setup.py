@@ -17,8 +17,7 @@ tests_require = [
     'pytest',
     'pytest-cache',
     'pytest-cover',
-    'pytest-flake8',
-    'flake8',
+    'pytest-xdist',
 ]
 
 
@@ -28,43 +27,14 @@ if sys.argv[-1] == 'info':
     sys.exit()
 
 if __name__ == '__main__':
-    with open('README.rst') as fh:
-        try:
-            import sphinx2rst
-            readme = sphinx2rst.sphinx_to_rst(fh)
-        except ImportError:
-            readme = fh.read()
+    with open('README.rst', encoding='utf-8') as fh:
+        readme = fh.read()
 
-    try:
-        import git
-        try:
-            repo = git.Repo('.')
-        except git.exc.InvalidGitRepositoryError:
-            raise ImportError()
-
-        if repo.bare:
-            raise ImportError()
-
-        tags = [tag.tag for tag in repo.tags if tag.tag]
-        tags = sorted(tags, key=lambda tag: tag.tagged_date, reverse=True)
-        changes = [
-            '',
-            '',
-            'Changelog',
-            '---------',
-        ]
-
-        for tag in tags:
-            version = tag.tag
-            if version[0] != 'v':
-                version = 'v' + version
-
-            message = tag.message.split('\n')[0]
-            changes.append(' * **%s** %s' % (version, message))
-
-        changes = '\n'.join(changes)
-    except ImportError:
-        changes = ''
+    # The changelog is rendered from the git tags by `tools/changelog.py`
+    # before a release
+    if os.path.isfile('CHANGELOG.rst'):
+        with open('CHANGELOG.rst', encoding='utf-8') as fh:
+            readme += '\n\n' + fh.read()
 
     setup(
         name=about['__package_name__'],
@@ -76,7 +46,7 @@ if __name__ == '__main__':
         license=about['__license__'],
         keywords=about['__title__'],
         packages=find_packages(exclude=['docs']),
-        long_description=readme + changes,
+        long_description=readme,
         include_package_data=True,
         tests_require=tests_require,
         setup_requires=[
@@ -86,10 +56,12 @@ if __name__ == '__main__':
         extras_require={
             'docs': [
                 'sphinx>=1.7.2',
-                'GitPython>=2.1.9',
-                'sphinx2rst',
             ],
             'tests': tests_require,
+            'numba': [
+                'numba',
+                'numpy',
+            ],
         },
         classifiers=[
             'Development Status :: 6 - Mature',
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+'''
+Render the changelog from the git tags for the PyPI long description
+
+This requires GitPython and is run by the maintainers before a release::
+
+    $ python tools/changelog.py > CHANGELOG.rst
+'''
+import git
+
+
+def render_changelog(path='.'):
+    repo = git.Repo(path)
+    tags = [tag.tag for tag in repo.tags if tag.tag]
+    tags = sorted(tags, key=lambda tag: tag.tagged_date, reverse=True)
+    changes = [
+        'Changelog',
+        '---------',
+    ]
+
+    for tag in tags:
+        version = tag.tag
+        if version[0] != 'v':
+            version = 'v' + version
+
+        message = tag.message.split('\n')[0]
+        changes.append(' * **%s** %s' % (version, message))
+
+    return '\n'.join(changes)
+
+
+if __name__ == '__main__':
+    print(render_changelog())